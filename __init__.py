@@ -1,9 +1,136 @@
 """Package initialization for yt_transcript_downloader.
 
 Provides convenient access to the transcript extraction functionality.
+
+``extract_transcript_direct`` is memoized in-process for an hour, keyed by
+video ID and language, so repeated calls for the same video do not hit
+YouTube again. Failed extractions are not cached. Call
+``extract_transcript_direct.cache_clear()`` to drop cached transcripts
+(e.g. between tests). Every call returns its own copy of a cached result,
+so callers may modify it freely. The uncached function remains available as
+``transcript_extractor.extract_transcript_direct``.
+
+Set ``YT_CACHE_DIR`` to a directory to also keep transcripts on disk for a
+week (requires the optional ``diskcache`` package), so they survive process
+restarts and are shared between worker processes. Pass ``use_cache=False``
+to bypass both caches for a single call.
 """
 
-from .transcript_extractor import extract_transcript_direct
+import os
+from threading import Lock
+from typing import Any, Dict, Optional
+
+import requests
+from cachetools import TTLCache
+
+from .transcript_extractor import extract_transcript_direct as _raw_extract_transcript_direct
+from .transcript_extractor import CONNECT_TIMEOUT, READ_TIMEOUT
+from .transcript_extractor import _build_language_list, extract_video_id
+
+try:
+    from diskcache import Cache as _DiskCache
+except ImportError:
+    _DiskCache = None
 
 __version__ = "1.0.0"
-__all__ = ["extract_transcript_direct"]
+__all__ = ["extract_transcript_direct", "extract_video_id"]
+
+_cache = TTLCache(maxsize=512, ttl=3600)
+_lock = Lock()
+
+# Optional second tier on disk, enabled by YT_CACHE_DIR
+DISK_CACHE_TTL = 7 * 24 * 3600
+_DISK_CACHE_TAG = "transcript"
+_disk_cache_dir = os.environ.get("YT_CACHE_DIR")
+_disk_cache = _DiskCache(_disk_cache_dir) if _DiskCache and _disk_cache_dir else None
+
+
+def _copy_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy a cached result deeply enough that callers cannot alter the cache."""
+    copied = dict(result)
+    if "segments" in copied:
+        copied["segments"] = [dict(segment) for segment in copied["segments"]]
+    for column in ("texts", "starts", "durations"):
+        if column in copied:
+            copied[column] = copied[column].copy()
+    return copied
+
+
+def extract_transcript_direct(
+    url: str,
+    language: Optional[str] = None,
+    session: Optional[requests.Session] = None,
+    connect_timeout: float = CONNECT_TIMEOUT,
+    read_timeout: float = READ_TIMEOUT,
+    as_arrays: bool = False,
+    use_cache: bool = True,
+) -> Optional[Dict[str, Any]]:
+    """
+    Extract transcript directly from YouTube, memoizing successful results.
+    
+    Same as transcript_extractor.extract_transcript_direct, with results
+    cached in memory (and on disk when YT_CACHE_DIR is set).
+    
+    Args:
+        url: Full YouTube URL (e.g., https://www.youtube.com/watch?v=abc123)
+        language: Preferred language code (e.g., "de", "en")
+        session: Optional requests session to use instead of the shared,
+                 pooled module session (e.g. one per worker thread)
+        connect_timeout: Seconds to wait for a connection to YouTube
+        read_timeout: Seconds to wait for YouTube to send data
+        as_arrays: Return the segments as parallel numpy arrays (requires
+                   numpy) for bulk processing of long transcripts
+        use_cache: Set to False to bypass both caches and always fetch
+    
+    Returns:
+        Dict with "text", "segments" and "language" (see
+        transcript_extractor.extract_transcript_direct), or None if
+        extraction failed
+    
+    Raises:
+        ImportError: If as_arrays=True and numpy is not installed
+    """
+    video_id = extract_video_id(url)
+    if not use_cache or not video_id:
+        return _raw_extract_transcript_direct(
+            url, language=language, session=session,
+            connect_timeout=connect_timeout, read_timeout=read_timeout,
+            as_arrays=as_arrays,
+        )
+    
+    key = (video_id, tuple(_build_language_list(language)), as_arrays)
+    with _lock:
+        result = _cache.get(key)
+    if result is not None:
+        return _copy_result(result)
+    
+    if _disk_cache is not None:
+        result = _disk_cache.get(key)
+        if result is not None:
+            with _lock:
+                _cache[key] = result
+            return _copy_result(result)
+    
+    result = _raw_extract_transcript_direct(
+        url, language=language, session=session,
+        connect_timeout=connect_timeout, read_timeout=read_timeout,
+        as_arrays=as_arrays,
+    )
+    if result is not None:
+        with _lock:
+            _cache[key] = result
+        if _disk_cache is not None:
+            _disk_cache.set(key, result, expire=DISK_CACHE_TTL, tag=_DISK_CACHE_TAG)
+        return _copy_result(result)
+    return result
+
+
+def _cache_clear() -> None:
+    """Drop all memoized transcripts, in memory and on disk."""
+    with _lock:
+        _cache.clear()
+    if _disk_cache is not None:
+        _disk_cache.evict(_DISK_CACHE_TAG)
+
+
+extract_transcript_direct.cache_clear = _cache_clear
@@ -3,35 +3,303 @@
 This module provides a simple HTTP API for the transcript extractor.
 """
 
+import os
+
+# Must run before anything imports socket/ssl (requests, urllib3)
+if os.environ.get("GEVENT_PATCH"):
+    from gevent import monkey
+    monkey.patch_all()
+
+import functools
+import hashlib
 import logging
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from flask import Flask, request, jsonify
+from threading import Lock
+import orjson
+from cachetools import TTLCache
+from flask import Flask, Response, request, jsonify, stream_with_context
+from flask.json.provider import JSONProvider
+from flask_compress import Compress
 from flask_cors import CORS
 
 # Add parent directory to path to import transcript_extractor
 parent_dir = Path(__file__).parent.parent
 sys.path.insert(0, str(parent_dir))
 
-from transcript_extractor import extract_transcript_direct
+from transcript_extractor import extract_transcript_direct, extract_video_id
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+class OrjsonProvider(JSONProvider):
+    """JSON provider backed by orjson for fast serialization of large transcripts."""
+    
+    options = orjson.OPT_NON_STR_KEYS
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=self.options).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        # Hand the encoded bytes straight to the response, skipping the str round-trip
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, option=self.options),
+            mimetype="application/json"
+        )
+
+
 # Create Flask app
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 
 # Enable CORS for all routes - more permissive for development
+# Browsers cache preflight responses for max_age seconds, saving a round-trip per request
+CORS_MAX_AGE = 86400  # 24 hours
 cors_config = {
     "origins": ["*"],
+    "send_wildcard": True,
+    "methods": ["POST", "OPTIONS"],
+    "allow_headers": ["Content-Type", "If-None-Match"],
+    "expose_headers": ["ETag", "X-Cache"],
+    "max_age": CORS_MAX_AGE,
+}
+job_cors_config = {
+    "origins": ["*"],
+    "send_wildcard": True,
     "methods": ["GET", "POST", "OPTIONS"],
     "allow_headers": ["Content-Type"],
+    "max_age": CORS_MAX_AGE,
 }
-CORS(app, resources={r"/api/*": cors_config}, supports_credentials=True)
+health_cors_config = {
+    "origins": ["*"],
+    "send_wildcard": True,
+    "methods": ["GET", "OPTIONS"],
+    "max_age": CORS_MAX_AGE,
+}
+# The API uses no cookies or auth, so credentials stay disabled and "*" applies as-is
+CORS(app, resources={
+    r"/api/transcript/jobs/?.*": job_cors_config,
+    r"/api/*": cors_config,
+    r"/health": health_cors_config,
+})
+
+# Compress JSON responses (Brotli when the client accepts it, else gzip).
+# Streamed responses are left alone: flask-compress 1.14 compresses them by
+# buffering the whole body, which would defeat the NDJSON stream.
+app.config['COMPRESS_MIMETYPES'] = ['application/json']
+app.config['COMPRESS_LEVEL'] = 6
+app.config['COMPRESS_MIN_SIZE'] = 1024
+app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+app.config['COMPRESS_STREAMS'] = False
+Compress(app)
+
+# In-process transcript cache keyed by (video_id, language)
+TRANSCRIPT_CACHE_TTL = 7 * 24 * 3600  # 7 days
+_TRANSCRIPT_CACHE = TTLCache(maxsize=2048, ttl=TRANSCRIPT_CACHE_TTL)
+_TRANSCRIPT_CACHE_LOCK = Lock()
+
+# Optional background job queue (RQ) for long videos, enabled by REDIS_URL.
+# Workers run separately: rq worker transcripts --url $REDIS_URL
+JOB_QUEUE_NAME = "transcripts"
+JOB_TIMEOUT = 300
+JOB_RESULT_TTL = 24 * 3600
+_JOB_QUEUE = None
+if os.environ.get("REDIS_URL"):
+    from redis import Redis
+    from rq import Queue
+    
+    _JOB_QUEUE = Queue(JOB_QUEUE_NAME, connection=Redis.from_url(os.environ["REDIS_URL"]))
+
+# Error for extractions that finished without a transcript
+EXTRACTION_FAILED_ERROR = "Failed to extract transcript. The video may not have captions available."
 
-# Configure app
-app.config['JSON_SORT_KEYS'] = False
+# Shared pool for fanning out batch extractions
+BATCH_MAX_URLS = 50
+_POOL = ThreadPoolExecutor(max_workers=16)
+
+
+def _get_transcript_entry(url, language):
+    """
+    Return the cached transcript entry for a URL, extracting it on a miss.
+    
+    Entries are stored column-wise to keep long-lived cache memory small:
+    {"text": str, "texts": [str], "starts": [float], "durations": [float],
+     "language": ..., "etag": str}
+    A segment's id is its index in the columns.
+    
+    Returns:
+        Tuple of (entry or None if extraction failed, "HIT" or "MISS")
+    """
+    video_id = extract_video_id(url)
+    cache_key = (video_id, language or "")
+    
+    if video_id:
+        with _TRANSCRIPT_CACHE_LOCK:
+            cached = _TRANSCRIPT_CACHE.get(cache_key)
+        if cached is not None:
+            logger.info(f"Cache hit for: {video_id}")
+            return cached, "HIT"
+    
+    logger.info(f"Extracting transcript from: {url}")
+    
+    # Extract transcript
+    result = extract_transcript_direct(url, language=language)
+    
+    if result is None:
+        return None, "MISS"
+    
+    # Log sizes only - never format transcript payloads into log messages
+    logger.info(f"Successfully extracted {len(result['segments'])} segments")
+    
+    segments = result['segments']
+    entry = {
+        "text": result['text'],
+        "texts": [segment['text'] for segment in segments],
+        "starts": [segment.get('start', 0.0) for segment in segments],
+        "durations": [segment.get('duration', 0.0) for segment in segments],
+        "language": result.get('language'),
+        "etag": _compute_etag(cache_key, result['text'])
+    }
+    
+    with _TRANSCRIPT_CACHE_LOCK:
+        _TRANSCRIPT_CACHE[cache_key] = entry
+    
+    return entry, "MISS"
+
+
+def _compute_etag(cache_key, text):
+    """Compute the ETag for a transcript from its (video_id, language) key and text."""
+    digest = hashlib.blake2b(digest_size=12)
+    digest.update("\0".join(cache_key).encode())
+    digest.update(text.encode())
+    return digest.hexdigest()
+
+
+def _iter_segments(entry):
+    """Yield legacy segment dicts from a columnar cache entry."""
+    for idx, (text, start, duration) in enumerate(zip(entry['texts'], entry['starts'], entry['durations'])):
+        yield {"id": idx, "text": text, "start": start, "duration": duration}
+
+
+def _legacy_payload(entry):
+    """Build the /api/transcript response body (list of segment dicts) from a cache entry."""
+    return {
+        "success": True,
+        "text": entry['text'],
+        "segments": list(_iter_segments(entry)),
+        "language": entry['language']
+    }
+
+
+def _v2_payload(entry):
+    """Build the /api/transcript/v2 response body (columnar segments) from a cache entry."""
+    return {
+        "success": True,
+        "text": entry['text'],
+        "texts": entry['texts'],
+        "starts": entry['starts'],
+        "durations": entry['durations'],
+        "language": entry['language']
+    }
+
+
+def _etag_matches(etag):
+    """
+    Check the request's If-None-Match header against a transcript ETag.
+    
+    flask-compress appends the encoding to the ETags it sends (W/"<hash>:br"),
+    so clients echo that form back; the suffix is ignored when comparing.
+    """
+    if_none_match = request.if_none_match
+    if if_none_match.star_tag:
+        return True
+    return any(
+        tag.split(":", 1)[0] == etag
+        for tag in if_none_match.as_set(include_weak=True)
+    )
+
+
+def _cached_response(entry, cache_status, build_payload):
+    """
+    Build a JSON response with caching headers for a cache entry.
+    
+    Answers 304 Not Modified without building or serializing the body
+    when the client already holds the current version (If-None-Match).
+    """
+    headers = {
+        'ETag': f'W/"{entry["etag"]}"',
+        'X-Cache': cache_status,
+        'Cache-Control': f"public, max-age={TRANSCRIPT_CACHE_TTL}"
+    }
+    
+    if _etag_matches(entry['etag']):
+        return "", 304, headers
+    
+    response = jsonify(build_payload(entry))
+    response.headers.update(headers)
+    return response, 200
+
+
+def _error_response(message, status):
+    """Build the JSON error body shared by every endpoint."""
+    return jsonify({
+        "success": False,
+        "error": message
+    }), status
+
+
+def _json_server_errors(action):
+    """Decorate a view so unexpected exceptions become a logged JSON 500 response."""
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            try:
+                return view(*args, **kwargs)
+            except Exception as e:
+                logger.error(f"Error {action}: {e}", exc_info=True)
+                return _error_response(f"Server error: {str(e)}", 500)
+        return wrapper
+    return decorator
+
+
+def _language_error(language):
+    """Return a 400 response if the requested language is not a string, else None."""
+    if language is None or isinstance(language, str):
+        return None
+    return _error_response("language must be a string", 400)
+
+
+def _parse_transcript_request():
+    """
+    Read url and language from the JSON body of a single-transcript request.
+    
+    Returns:
+        Tuple of (url, language, None), or (None, None, 400 response) if the
+        body is missing or invalid
+    """
+    data = request.get_json()
+    
+    if not data:
+        return None, None, _error_response("No JSON data provided", 400)
+    
+    url = data.get('url')
+    language = data.get('language')
+    
+    if not isinstance(url, str) or not url.strip():
+        return None, None, _error_response("URL is required", 400)
+    
+    language_error = _language_error(language)
+    if language_error:
+        return None, None, language_error
+    
+    return url.strip(), language, None
 
 
 @app.route('/health', methods=['GET'])
@@ -44,6 +312,7 @@ def health_check():
 
 
 @app.route('/api/transcript', methods=['POST'])
+@_json_server_errors("extracting transcript")
 def get_transcript():
     """
     Extract transcript from YouTube video.
@@ -62,38 +331,175 @@ def get_transcript():
         "language": null
     }
     """
+    url, language, error = _parse_transcript_request()
+    if error:
+        return error
+    
+    entry, cache_status = _get_transcript_entry(url, language)
+    
+    if entry is None:
+        return _error_response(EXTRACTION_FAILED_ERROR, 422)
+    
+    return _cached_response(entry, cache_status, _legacy_payload)
+
+
+@app.route('/api/transcript/v2', methods=['POST'])
+@_json_server_errors("extracting transcript")
+def get_transcript_v2():
+    """
+    Extract transcript from YouTube video in columnar form.
+    
+    Request body is the same as for /api/transcript.
+    
+    Response (segment i is texts[i], starts[i], durations[i]):
+    {
+        "success": true,
+        "text": "Full transcript...",
+        "texts": ["...", ...],
+        "starts": [0.0, ...],
+        "durations": [1.2, ...],
+        "language": null
+    }
+    """
+    url, language, error = _parse_transcript_request()
+    if error:
+        return error
+    
+    entry, cache_status = _get_transcript_entry(url, language)
+    
+    if entry is None:
+        return _error_response(EXTRACTION_FAILED_ERROR, 422)
+    
+    return _cached_response(entry, cache_status, _v2_payload)
+
+
+@app.route('/api/transcript/stream', methods=['POST'])
+@_json_server_errors("streaming transcript")
+def stream_transcript():
+    """
+    Extract transcript from YouTube video and stream it as NDJSON.
+    
+    Request body is the same as for /api/transcript.
+    
+    Response (application/x-ndjson, one JSON object per line):
+        {"id": 0, "text": "...", "start": 0.0, "duration": 1.2}
+        {"id": 1, "text": "...", "start": 1.2, "duration": 2.0}
+        ...
+        {"__meta__": true, "language": null, "segments": 2}
+    
+    Errors are reported as a regular JSON response before streaming starts.
+    """
+    url, language, error = _parse_transcript_request()
+    if error:
+        return error
+    
+    entry, cache_status = _get_transcript_entry(url, language)
+    
+    if entry is None:
+        return _error_response(EXTRACTION_FAILED_ERROR, 422)
+    
+    def generate():
+        # Encode one line at a time so the full document is never materialized
+        for segment in _iter_segments(entry):
+            yield orjson.dumps(segment) + b"\n"
+        yield orjson.dumps({
+            "__meta__": True,
+            "language": entry['language'],
+            "segments": len(entry['texts'])
+        }) + b"\n"
+    
+    response = Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+    response.headers['X-Cache'] = cache_status
+    return response, 200
+
+
+@app.route('/api/transcript/jobs', methods=['POST'])
+@_json_server_errors("queueing transcript job")
+def create_transcript_job():
+    """
+    Queue a transcript extraction and return immediately.
+    
+    Request body is the same as for /api/transcript.
+    
+    Response (202 Accepted):
+    {
+        "success": true,
+        "job_id": "...",
+        "poll": "/api/transcript/jobs/<job_id>"
+    }
+    """
+    if _JOB_QUEUE is None:
+        return _error_response("Background jobs are not configured (set REDIS_URL)", 503)
+    
+    url, language, error = _parse_transcript_request()
+    if error:
+        return error
+    
+    if not extract_video_id(url):
+        return _error_response("Not a valid YouTube URL", 400)
+    
+    job = _JOB_QUEUE.enqueue(
+        extract_transcript_direct,
+        url,
+        language=language,
+        job_timeout=JOB_TIMEOUT,
+        result_ttl=JOB_RESULT_TTL
+    )
+    logger.info(f"Queued transcript job {job.id} for: {url}")
+    
+    return jsonify({
+        "success": True,
+        "job_id": job.id,
+        "poll": f"/api/transcript/jobs/{job.id}"
+    }), 202
+
+
+@app.route('/api/transcript/jobs/<job_id>', methods=['GET'])
+def get_transcript_job(job_id):
+    """
+    Poll a queued transcript extraction.
+    
+    Response:
+        202 {"success": true, "status": "queued" | "started" | ...} while pending
+        200 with the same body as /api/transcript when finished
+        422 if the extraction finished without a transcript
+        404 if the job is unknown or expired
+    """
+    if _JOB_QUEUE is None:
+        return _error_response("Background jobs are not configured (set REDIS_URL)", 503)
+    
+    from rq.exceptions import NoSuchJobError
+    from rq.job import Job
+    
     try:
-        # Get JSON data
-        data = request.get_json()
+        try:
+            job = Job.fetch(job_id, connection=_JOB_QUEUE.connection)
+        except NoSuchJobError:
+            return _error_response("Job not found", 404)
         
-        if not data:
-            return jsonify({
-                "success": False,
-                "error": "No JSON data provided"
-            }), 400
-        
-        url = data.get('url', '').strip()
-        language = data.get('language')
+        status = job.get_status()
         
-        if not url:
+        if job.is_failed:
             return jsonify({
                 "success": False,
-                "error": "URL is required"
-            }), 400
+                "status": status,
+                "error": "Transcript extraction failed"
+            }), 500
         
-        logger.info(f"Extracting transcript from: {url}")
-        
-        # Extract transcript
-        result = extract_transcript_direct(url, language=language)
+        if not job.is_finished:
+            return jsonify({
+                "success": True,
+                "status": status
+            }), 202
         
+        result = job.return_value()
         if result is None:
             return jsonify({
                 "success": False,
-                "error": "Failed to extract transcript. The video may not have captions available."
+                "status": status,
+                "error": EXTRACTION_FAILED_ERROR
             }), 422
         
-        logger.info(f"Successfully extracted {len(result['segments'])} segments")
-        
         return jsonify({
             "success": True,
             "text": result['text'],
@@ -102,11 +508,83 @@ def get_transcript():
         }), 200
     
     except Exception as e:
-        logger.error(f"Error extracting transcript: {e}", exc_info=True)
-        return jsonify({
-            "success": False,
-            "error": f"Server error: {str(e)}"
-        }), 500
+        logger.error(f"Error polling transcript job {job_id}: {e}", exc_info=True)
+        return _error_response(f"Server error: {str(e)}", 500)
+
+
+@app.route('/api/transcripts/batch', methods=['POST'])
+@_json_server_errors("extracting batch")
+def get_transcripts_batch():
+    """
+    Extract transcripts for several YouTube videos concurrently.
+    
+    Request body:
+    {
+        "urls": ["https://www.youtube.com/watch?v=...", ...],  # Up to 50
+        "language": "en"  # Optional, applies to all URLs
+    }
+    
+    Response (results are in the same order as the request URLs):
+    {
+        "success": true,
+        "results": [
+            {"url": "...", "success": true, "text": "...", "segments": [...], "language": null},
+            {"url": "...", "success": false, "error": "..."},
+            ...
+        ]
+    }
+    """
+    data = request.get_json()
+    
+    if not data:
+        return _error_response("No JSON data provided", 400)
+    
+    urls = data.get('urls')
+    language = data.get('language')
+    
+    language_error = _language_error(language)
+    if language_error:
+        return language_error
+    
+    if not isinstance(urls, list) or not urls:
+        return _error_response("urls must be a non-empty list", 400)
+    
+    if len(urls) > BATCH_MAX_URLS:
+        return _error_response(f"At most {BATCH_MAX_URLS} URLs per batch", 400)
+    
+    if not all(isinstance(url, str) and url.strip() for url in urls):
+        return _error_response("Every URL must be a non-empty string", 400)
+    
+    urls = [url.strip() for url in urls]
+    logger.info(f"Extracting batch of {len(urls)} transcripts")
+    
+    # Submit each distinct URL once; duplicates share the same future
+    futures = {}
+    for url in urls:
+        if url not in futures:
+            futures[url] = _POOL.submit(_get_transcript_entry, url, language)
+    
+    results = []
+    for url in urls:
+        try:
+            entry, _ = futures[url].result()
+        except Exception as e:
+            logger.error(f"Error extracting transcript for {url}: {e}", exc_info=True)
+            entry = None
+        
+        if entry is None:
+            results.append({
+                "url": url,
+                "success": False,
+                "error": EXTRACTION_FAILED_ERROR
+            })
+        else:
+            results.append({"url": url, **_legacy_payload(entry)})
+    
+    return jsonify({
+        "success": True,
+        "results": results
+    }), 200
 
 
 @app.errorhandler(404)
@@ -128,11 +606,15 @@ def server_error(error):
 
 
 if __name__ == '__main__':
-    import os
-    
     port = int(os.environ.get('PORT', 8000))
     debug = os.environ.get('FLASK_ENV', 'development') == 'development'
     
+    if not debug:
+        # The Werkzeug server handles one request at a time; use Gunicorn in production
+        logger.error("Refusing to start the development server in production mode")
+        logger.error("Run: gunicorn -c gunicorn.conf.py backend.app:app")
+        sys.exit(1)
+    
     logger.info(f"Starting YouTube Transcript Downloader API on port {port}")
     logger.info(f"Debug mode: {debug}")
     
@@ -0,0 +1,356 @@
+"""
+Unit tests for the Flask API wrapper.
+
+Run with: python -m pytest backend/test_app.py
+"""
+
+import pytest
+from unittest.mock import patch
+
+pytest.importorskip("flask")
+
+import app as backend
+
+
+VIDEO_URL = "https://www.youtube.com/watch?v=jNQXAC9IVRw"
+
+# Long enough to exceed COMPRESS_MIN_SIZE, so responses are really compressed
+RESULT = {
+    "text": " ".join(f"caption {i}" for i in range(200)),
+    "segments": [
+        {"id": i, "text": f"caption {i}", "start": float(i), "duration": 1.0}
+        for i in range(200)
+    ],
+    "language": None,
+}
+
+
+@pytest.fixture
+def client():
+    """Test client with an empty transcript cache and mocked extraction."""
+    backend._TRANSCRIPT_CACHE.clear()
+    with patch.object(backend, "extract_transcript_direct", return_value=RESULT) as mock_extract:
+        with backend.app.test_client() as test_client:
+            test_client.mock_extract = mock_extract
+            yield test_client
+    backend._TRANSCRIPT_CACHE.clear()
+
+
+class TestTranscriptEntry:
+    """Tests for the columnar cache entry and the payloads built from it."""
+    
+    def test_entry_is_columnar(self, client):
+        """Test that segments are cached as parallel columns."""
+        entry, cache_status = backend._get_transcript_entry(VIDEO_URL, None)
+        
+        assert cache_status == "MISS"
+        assert entry["text"] == RESULT["text"]
+        assert entry["texts"] == [s["text"] for s in RESULT["segments"]]
+        assert entry["starts"] == [s["start"] for s in RESULT["segments"]]
+        assert entry["durations"] == [s["duration"] for s in RESULT["segments"]]
+        assert "segments" not in entry
+    
+    def test_second_lookup_hits_cache(self, client):
+        """Test that a cached entry is returned without extracting again."""
+        first, _ = backend._get_transcript_entry(VIDEO_URL, None)
+        second, cache_status = backend._get_transcript_entry(VIDEO_URL, None)
+        
+        assert cache_status == "HIT"
+        assert second is first
+        assert client.mock_extract.call_count == 1
+    
+    def test_legacy_payload_rebuilds_segments(self, client):
+        """Test that the legacy payload restores the original segment dicts."""
+        entry, _ = backend._get_transcript_entry(VIDEO_URL, None)
+        payload = backend._legacy_payload(entry)
+        
+        assert payload["success"] is True
+        assert payload["segments"] == RESULT["segments"]
+        assert payload["text"] == RESULT["text"]
+        assert payload["language"] is None
+    
+    def test_v2_payload_is_columnar(self, client):
+        """Test that the v2 payload passes the columns through."""
+        entry, _ = backend._get_transcript_entry(VIDEO_URL, None)
+        payload = backend._v2_payload(entry)
+        
+        assert payload["texts"] == entry["texts"]
+        assert payload["starts"] == entry["starts"]
+        assert payload["durations"] == entry["durations"]
+        assert "segments" not in payload
+    
+    def test_v2_endpoint(self, client):
+        """Test that /api/transcript/v2 serves columns and shares the cache."""
+        client.post("/api/transcript", json={"url": VIDEO_URL})
+        response = client.post("/api/transcript/v2", json={"url": VIDEO_URL})
+        body = response.get_json()
+        
+        assert response.status_code == 200
+        assert response.headers["X-Cache"] == "HIT"
+        assert body["success"] is True
+        assert body["texts"][:2] == ["caption 0", "caption 1"]
+        assert body["starts"][:2] == [0.0, 1.0]
+        assert len(body["durations"]) == len(RESULT["segments"])
+        assert client.mock_extract.call_count == 1
+    
+    def test_v2_endpoint_extraction_failure(self, client):
+        """Test that a failed extraction returns 422 on the v2 endpoint."""
+        client.mock_extract.return_value = None
+        response = client.post("/api/transcript/v2", json={"url": VIDEO_URL})
+        
+        assert response.status_code == 422
+        assert response.get_json()["success"] is False
+
+
+class TestRequestValidation:
+    """Tests for rejecting malformed request bodies before extraction."""
+    
+    @pytest.mark.parametrize("path", ["/api/transcript", "/api/transcript/v2", "/api/transcript/stream"])
+    def test_non_string_language_rejected(self, client, path):
+        """Test that a list language is a 400, not an unhashable cache key."""
+        response = client.post(path, json={"url": VIDEO_URL, "language": ["en"]})
+        
+        assert response.status_code == 400
+        assert response.get_json()["error"] == "language must be a string"
+        assert not client.mock_extract.called
+    
+    def test_int_language_rejected_before_extraction(self, client):
+        """Test that an int language never reaches extraction or the ETag hash."""
+        response = client.post("/api/transcript", json={"url": VIDEO_URL, "language": 5})
+        
+        assert response.status_code == 400
+        assert not client.mock_extract.called
+        assert len(backend._TRANSCRIPT_CACHE) == 0
+    
+    def test_int_language_rejected_for_batch(self, client):
+        """Test that a bad batch language is a 400, not a failure per URL."""
+        response = client.post("/api/transcripts/batch", json={"urls": [VIDEO_URL], "language": 5})
+        
+        assert response.status_code == 400
+        assert not client.mock_extract.called
+    
+    @pytest.mark.parametrize("body", [{}, {"url": ""}, {"url": "   "}, {"url": 5}])
+    @pytest.mark.parametrize("path", ["/api/transcript", "/api/transcript/v2", "/api/transcript/stream"])
+    def test_missing_url_rejected(self, client, path, body):
+        """Test that every single-transcript endpoint requires a URL string."""
+        response = client.post(path, json=body)
+        
+        assert response.status_code == 400
+        assert response.get_json()["success"] is False
+        assert not client.mock_extract.called
+    
+    @pytest.mark.parametrize("path", ["/api/transcript", "/api/transcript/v2", "/api/transcript/stream"])
+    def test_unexpected_error_is_json_500(self, client, path):
+        """Test that an exception during extraction becomes a JSON 500 response."""
+        client.mock_extract.side_effect = RuntimeError("boom")
+        
+        response = client.post(path, json={"url": VIDEO_URL})
+        
+        assert response.status_code == 500
+        assert response.get_json() == {"success": False, "error": "Server error: boom"}
+    
+    def test_string_language_accepted(self, client):
+        """Test that a language code is passed through to extraction."""
+        response = client.post("/api/transcript", json={"url": VIDEO_URL, "language": "en"})
+        
+        assert response.status_code == 200
+        assert client.mock_extract.call_args[1]["language"] == "en"
+
+
+def _result_for(url, language=None):
+    """Fake extraction returning the video ID as text; BBBBBBBBBBB has no captions."""
+    video_id = backend.extract_video_id(url)
+    if video_id == "BBBBBBBBBBB":
+        return None
+    return {
+        "text": video_id,
+        "segments": [{"id": 0, "text": video_id, "start": 0.0, "duration": 1.0}],
+        "language": language,
+    }
+
+
+class TestBatch:
+    """Tests for the concurrent batch endpoint."""
+    
+    def test_results_in_request_order(self, client):
+        """Test that results follow the request order whatever finishes first."""
+        client.mock_extract.side_effect = _result_for
+        ids = ["AAAAAAAAAAA", "CCCCCCCCCCC", "DDDDDDDDDDD"]
+        urls = [f"https://youtu.be/{video_id}" for video_id in ids]
+        
+        response = client.post("/api/transcripts/batch", json={"urls": urls})
+        results = response.get_json()["results"]
+        
+        assert response.status_code == 200
+        assert [r["url"] for r in results] == urls
+        assert [r["text"] for r in results] == ids
+        assert all(r["success"] for r in results)
+    
+    def test_duplicate_urls_extracted_once(self, client):
+        """Test that repeated URLs share one extraction."""
+        client.mock_extract.side_effect = _result_for
+        url = "https://youtu.be/AAAAAAAAAAA"
+        
+        response = client.post("/api/transcripts/batch", json={"urls": [url, url, url]})
+        
+        assert [r["text"] for r in response.get_json()["results"]] == ["AAAAAAAAAAA"] * 3
+        assert client.mock_extract.call_count == 1
+    
+    def test_failed_url_alongside_successes(self, client):
+        """Test that one video without captions does not fail the batch."""
+        client.mock_extract.side_effect = _result_for
+        urls = ["https://youtu.be/AAAAAAAAAAA", "https://youtu.be/BBBBBBBBBBB",
+                "https://youtu.be/CCCCCCCCCCC"]
+        
+        response = client.post("/api/transcripts/batch", json={"urls": urls})
+        results = response.get_json()["results"]
+        
+        assert response.status_code == 200
+        assert [r["success"] for r in results] == [True, False, True]
+        assert results[1] == {
+            "url": urls[1],
+            "success": False,
+            "error": "Failed to extract transcript. The video may not have captions available.",
+        }
+    
+    def test_too_many_urls(self, client):
+        """Test that batches over BATCH_MAX_URLS are rejected."""
+        urls = [VIDEO_URL] * (backend.BATCH_MAX_URLS + 1)
+        
+        response = client.post("/api/transcripts/batch", json={"urls": urls})
+        
+        assert response.status_code == 400
+        assert not client.mock_extract.called
+    
+    @pytest.mark.parametrize("urls", [VIDEO_URL, [], None, [VIDEO_URL, 5], [VIDEO_URL, "  "]])
+    def test_malformed_urls(self, client, urls):
+        """Test that urls must be a non-empty list of non-empty strings."""
+        response = client.post("/api/transcripts/batch", json={"urls": urls})
+        
+        assert response.status_code == 400
+        assert response.get_json()["success"] is False
+        assert not client.mock_extract.called
+
+
+@pytest.fixture
+def job_queue(client, monkeypatch):
+    """RQ queue on an in-memory Redis, with extraction faked by _result_for."""
+    fakeredis = pytest.importorskip("fakeredis")
+    rq = pytest.importorskip("rq")
+    
+    queue = rq.Queue(backend.JOB_QUEUE_NAME, connection=fakeredis.FakeStrictRedis())
+    monkeypatch.setattr(backend, "_JOB_QUEUE", queue)
+    # Jobs reference their function by import path, so a mock cannot be queued
+    monkeypatch.setattr(backend, "extract_transcript_direct", _result_for)
+    return queue
+
+
+def _run_jobs(queue):
+    """Run every queued job in-process, then return."""
+    from rq import SimpleWorker
+    
+    SimpleWorker([queue], connection=queue.connection).work(burst=True)
+
+
+class TestJobs:
+    """Tests for the background job endpoints."""
+    
+    def test_not_configured_without_redis(self, client):
+        """Test that both job endpoints answer 503 when REDIS_URL is unset."""
+        assert backend._JOB_QUEUE is None
+        
+        assert client.post("/api/transcript/jobs", json={"url": VIDEO_URL}).status_code == 503
+        assert client.get("/api/transcript/jobs/some-id").status_code == 503
+    
+    def test_pending_then_finished(self, client, job_queue):
+        """Test that a job polls as 202 until a worker has run it, then 200."""
+        response = client.post("/api/transcript/jobs", json={"url": "https://youtu.be/AAAAAAAAAAA"})
+        body = response.get_json()
+        
+        assert response.status_code == 202
+        assert body["poll"] == f"/api/transcript/jobs/{body['job_id']}"
+        
+        pending = client.get(body["poll"])
+        assert pending.status_code == 202
+        assert pending.get_json() == {"success": True, "status": "queued"}
+        
+        _run_jobs(job_queue)
+        finished = client.get(body["poll"])
+        
+        assert finished.status_code == 200
+        assert finished.get_json()["text"] == "AAAAAAAAAAA"
+        assert finished.get_json()["segments"][0]["text"] == "AAAAAAAAAAA"
+    
+    def test_finished_without_transcript(self, client, job_queue):
+        """Test that a job that found no captions polls as 422."""
+        response = client.post("/api/transcript/jobs", json={"url": "https://youtu.be/BBBBBBBBBBB"})
+        _run_jobs(job_queue)
+        
+        finished = client.get(response.get_json()["poll"])
+        
+        assert finished.status_code == 422
+        assert finished.get_json()["success"] is False
+    
+    def test_unknown_job(self, client, job_queue):
+        """Test that an unknown or expired job id is a 404."""
+        response = client.get("/api/transcript/jobs/does-not-exist")
+        
+        assert response.status_code == 404
+    
+    def test_invalid_url_not_queued(self, client, job_queue):
+        """Test that a non-YouTube URL is rejected before queueing."""
+        response = client.post("/api/transcript/jobs", json={"url": "https://example.com/video"})
+        
+        assert response.status_code == 400
+        assert job_queue.count == 0
+    
+    def test_cors_preflight_for_poll_url(self, client):
+        """Test that the job CORS rules, allowing GET, apply to the poll URL."""
+        response = client.options("/api/transcript/jobs/some-id", headers={
+            "Origin": "https://example.com",
+            "Access-Control-Request-Method": "GET",
+        })
+        
+        assert "GET" in response.headers["Access-Control-Allow-Methods"]
+
+
+class TestETag:
+    """Tests for conditional requests on transcript responses."""
+    
+    def test_not_modified_with_compressed_etag(self, client):
+        """Test that the ETag of a compressed response yields 304 when sent back."""
+        first = client.post("/api/transcript", json={"url": VIDEO_URL},
+                            headers={"Accept-Encoding": "br"})
+        etag = first.headers["ETag"]
+        
+        # flask-compress may append the encoding: W/"<hash>:br"
+        for tag in (etag, etag[:-1] + ':br"'):
+            second = client.post("/api/transcript", json={"url": VIDEO_URL},
+                                 headers={"Accept-Encoding": "br", "If-None-Match": tag})
+            
+            assert second.status_code == 304
+            assert second.data == b""
+    
+    def test_stale_etag_gets_full_body(self, client):
+        """Test that a non-matching ETag returns the transcript."""
+        response = client.post("/api/transcript", json={"url": VIDEO_URL},
+                               headers={"If-None-Match": 'W/"0123456789abcdef01234567"'})
+        
+        assert response.status_code == 200
+        assert response.get_json()["text"] == RESULT["text"]
+
+
+class TestStream:
+    """Tests for the NDJSON streaming endpoint."""
+    
+    def test_stream_not_buffered_by_compression(self, client):
+        """Test that the stream is sent uncompressed and without a Content-Length."""
+        response = client.post("/api/transcript/stream", json={"url": VIDEO_URL},
+                               headers={"Accept-Encoding": "br, gzip"})
+        
+        assert response.status_code == 200
+        assert response.is_streamed
+        assert "Content-Encoding" not in response.headers
+        assert "Content-Length" not in response.headers
+        lines = response.data.splitlines()
+        assert len(lines) == len(RESULT["segments"]) + 1
@@ -5,6 +5,7 @@ This script demonstrates various ways to use the transcript extraction library.
 """
 
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from yt_transcript_downloader import extract_transcript_direct
 
 # Configure logging to see what's happening
@@ -68,7 +69,7 @@ def example_working_with_segments():
 
 
 def example_batch_processing():
-    """Example: Process multiple URLs with error handling."""
+    """Example: Process multiple URLs concurrently with error handling."""
     print("\n=== Example 4: Batch Processing ===")
     
     urls = [
@@ -76,11 +77,11 @@ def example_batch_processing():
         "https://youtu.be/jNQXAC9IVRw",  # Different URL format
     ]
     
-    results = {}
-    for url in urls:
-        print(f"Processing: {url}")
-        result = extract_transcript_direct(url)
-        results[url] = result
+    # Extraction is network-bound, so threads overlap the YouTube round-trips.
+    # All threads share the library's pooled session and result cache.
+    print(f"Processing {len(urls)} URLs concurrently")
+    with ThreadPoolExecutor(max_workers=min(8, len(urls))) as executor:
+        results = dict(zip(urls, executor.map(extract_transcript_direct, urls)))
     
     # Summary
     successful = sum(1 for r in results.values() if r)
@@ -0,0 +1,24 @@
+"""Gunicorn configuration for the YouTube Transcript Downloader API.
+
+Run from the project root:
+    gunicorn -c gunicorn.conf.py backend.app:app
+"""
+
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 8000)}"
+
+# Transcript extraction is almost entirely waiting on YouTube HTTP
+# round-trips. gevent workers multiplex many requests per process, so a
+# few workers are enough. Set GUNICORN_WORKER_CLASS=sync to fall back to
+# one request per process (then raise WEB_CONCURRENCY to 2 * CPU + 1).
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gevent")
+worker_connections = 500
+workers = int(os.environ.get("WEB_CONCURRENCY", min(4, max(2, multiprocessing.cpu_count()))))
+
+timeout = 60
+keepalive = 65
+
+accesslog = "-"
+errorlog = "-"
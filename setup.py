@@ -16,7 +16,14 @@ setup(
     python_requires=">=3.8",
     install_requires=[
         "requests>=2.25.0",
+        "cachetools>=4.2.0",
     ],
+    extras_require={
+        "async": ["aiohttp>=3.8"],
+        "fast": ["orjson>=3.9"],
+        "cache": ["diskcache>=5.6"],
+        "arrays": ["numpy>=1.20"],
+    },
     classifiers=[
         "Development Status :: 5 - Production/Stable",
         "Intended Audience :: Developers",
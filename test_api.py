@@ -13,7 +13,7 @@ print("=" * 60)
 try:
     response = requests.get(f"{BASE_URL}/health")
     print(f"Status: {response.status_code}")
-    print(f"Response: {json.dumps(response.json(), indent=2)}")
+    print(f"Response: {json.dumps(response.json())}")
 except Exception as e:
     print(f"Error: {e}")
 
@@ -36,7 +36,7 @@ payload = {
 
 try:
     print(f"Sending request to: {BASE_URL}/api/transcript")
-    print(f"Payload: {json.dumps(payload, indent=2)}")
+    print(f"Payload: {json.dumps(payload)}")
     
     response = requests.post(
         f"{BASE_URL}/api/transcript",
@@ -81,7 +81,8 @@ try:
     )
     print(f"Status: {response.status_code}")
     data = response.json()
-    print(f"Response: {json.dumps(data, indent=2)}")
+    # Bound the output in case the server unexpectedly returns a full transcript
+    print(f"Response: {json.dumps(data, indent=2)[:2000]}")
 except Exception as e:
     print(f"Error: {e}")
 
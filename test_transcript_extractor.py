@@ -4,54 +4,117 @@ Unit tests for yt_transcript_downloader.
 Run with: python -m pytest test_transcript_extractor.py
 """
 
+import inspect
+import json
+import threading
+import time
 import pytest
 from unittest.mock import patch, MagicMock
-from yt_transcript_downloader import extract_transcript_direct
+from yt_transcript_downloader import extract_transcript_direct, extract_video_id
 from yt_transcript_downloader.transcript_extractor import (
-    _extract_api_key_from_html,
-    _format_transcript_no_timestamps,
+    _WatchPageScanner,
+    _build_language_list,
+    _build_result,
+    _create_session_with_retries,
+    _extract_params_from_html,
+    _iter_captions,
+    _iter_timedtext_captions,
+    _select_caption_track,
+    _timedtext_json3_url,
 )
 
 
+def _wait_for(condition, timeout=2.0):
+    """Poll until condition() is true or the timeout expires."""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+@pytest.fixture(autouse=True)
+def clear_transcript_cache():
+    """Start every test with an empty in-process transcript cache."""
+    extract_transcript_direct.cache_clear()
+    yield
+    extract_transcript_direct.cache_clear()
+
+
 class TestExtractApiKey:
-    """Tests for API key extraction from HTML."""
+    """Tests for API key extraction from the watch page."""
     
     def test_extract_valid_api_key(self):
         """Test extracting a valid API key from HTML."""
-        html = '''
+        html = b'''
         <html>
             <script>
             var config = {"INNERTUBE_API_KEY":"AIzaSyTest1234567890"}
             </script>
         </html>
         '''
-        key = _extract_api_key_from_html(html)
-        assert key == "AIzaSyTest1234567890"
+        scanner = _WatchPageScanner()
+        scanner.feed(html)
+        assert scanner.api_key == "AIzaSyTest1234567890"
+    
+    def test_extract_api_key_with_whitespace(self):
+        """Test extracting the API key when the JSON has spaces around the colon."""
+        scanner = _WatchPageScanner()
+        scanner.feed(b'<script>ytcfg.set({"INNERTUBE_API_KEY" : "AIzaSyTest1234567890"})</script>')
+        assert scanner.api_key == "AIzaSyTest1234567890"
     
     def test_extract_api_key_missing(self):
         """Test when API key is not in HTML."""
-        html = "<html><body>No API key here</body></html>"
-        key = _extract_api_key_from_html(html)
-        assert key is None
+        scanner = _WatchPageScanner()
+        scanner.feed(b'<html><body>{"getTranscriptEndpoint":{"params":"CgtwYXJhbXM="}}</body></html>')
+        assert scanner.api_key is None
+        assert scanner.result() is None
     
     def test_extract_api_key_empty_html(self):
         """Test with empty HTML."""
-        html = ""
-        key = _extract_api_key_from_html(html)
-        assert key is None
+        scanner = _WatchPageScanner()
+        assert not scanner.feed(b"")
+        assert scanner.api_key is None
+
+
+class TestWatchPageScanner:
+    """Tests for the incremental watch page scan."""
+    
+    def test_stops_once_both_values_found(self):
+        """Test that scanning reports done as soon as key and params are seen."""
+        scanner = _WatchPageScanner()
+        
+        assert not scanner.feed(b'{"getTranscriptEndpoint":{"params":"CgtwYXJhbXM="}}')
+        assert scanner.feed(b'{"INNERTUBE_API_KEY":"AIzaSyTest1234567890"}')
+        assert scanner.result() == {"params": "CgtwYXJhbXM=", "api_key": "AIzaSyTest1234567890"}
+    
+    def test_known_api_key_stops_at_params(self):
+        """Test that a known API key lets the scan finish on the params alone."""
+        scanner = _WatchPageScanner(api_key="AIzaSyCached")
+        
+        assert scanner.feed(b'{"getTranscriptEndpoint":{"params":"CgtwYXJhbXM="}}')
+        assert scanner.result() == {"params": "CgtwYXJhbXM=", "api_key": "AIzaSyCached"}
+    
+    def test_missing_params(self):
+        """Test that a page without params yields no result."""
+        scanner = _WatchPageScanner()
+        scanner.feed(b'{"INNERTUBE_API_KEY":"AIzaSyTest1234567890"}')
+        
+        assert scanner.result() is None
 
 
-class TestFormatTranscript:
-    """Tests for transcript formatting."""
+class TestBuildResult:
+    """Tests for building the transcript result."""
     
-    def test_format_transcript_basic(self):
+    def test_build_result_basic(self):
         """Test basic transcript formatting."""
         captions = [
-            {"text": "Hello", "start": 0.0, "duration": 1.0},
-            {"text": "World", "start": 1.0, "duration": 1.0},
+            ("Hello", 0.0, 1.0),
+            ("World", 1.0, 1.0),
         ]
         
-        result = _format_transcript_no_timestamps(captions)
+        result = _build_result(captions)
         
         assert result["text"] == "Hello World"
         assert len(result["segments"]) == 2
@@ -59,68 +122,213 @@ class TestFormatTranscript:
         assert result["segments"][1]["text"] == "World"
         assert result["language"] is None
     
-    def test_format_transcript_empty(self):
+    def test_build_result_empty(self):
         """Test with empty captions."""
         captions = []
-        result = _format_transcript_no_timestamps(captions)
+        result = _build_result(captions)
         
         assert result["text"] == ""
         assert result["segments"] == []
     
-    def test_format_transcript_with_whitespace(self):
+    def test_build_result_with_whitespace(self):
         """Test that whitespace is handled correctly."""
         captions = [
-            {"text": "  Hello  ", "start": 0.0, "duration": 1.0},
-            {"text": "  World  ", "start": 1.0, "duration": 1.0},
+            ("  Hello  ", 0.0, 1.0),
+            ("  World  ", 1.0, 1.0),
         ]
         
-        result = _format_transcript_no_timestamps(captions)
+        result = _build_result(captions)
         
         # Text should be trimmed but joined with space
         assert result["text"] == "Hello World"
     
-    def test_format_transcript_skip_empty_text(self):
+    def test_build_result_skip_empty_text(self):
         """Test that empty text captions are skipped."""
         captions = [
-            {"text": "Hello", "start": 0.0, "duration": 1.0},
-            {"text": "", "start": 1.0, "duration": 1.0},
-            {"text": "World", "start": 2.0, "duration": 1.0},
+            ("Hello", 0.0, 1.0),
+            ("", 1.0, 1.0),
+            ("World", 2.0, 1.0),
         ]
         
-        result = _format_transcript_no_timestamps(captions)
+        result = _build_result(captions)
         
         assert result["text"] == "Hello World"
         assert len(result["segments"]) == 2  # Only non-empty segments
+        assert [seg["id"] for seg in result["segments"]] == [0, 1]
+
+
+class TestIterCaptions:
+    """Tests for lazy conversion of API segments to captions."""
+    
+    def test_converts_and_skips_malformed_segments(self):
+        """Test timing conversion and that malformed segments are dropped."""
+        segments = [
+            {"transcriptSegmentRenderer": {
+                "startMs": "0", "endMs": "1500",
+                "snippet": {"runs": [{"text": "Hello"}]},
+            }},
+            {"transcriptSectionHeaderRenderer": {}},
+            {"transcriptSegmentRenderer": {
+                "startMs": "1500",
+                "snippet": {"runs": [{"text": "World"}]},
+            }},
+        ]
+        
+        captions = _iter_captions(segments)
+        
+        assert not isinstance(captions, list)
+        assert list(captions) == [
+            ("Hello", 0.0, 1.5),
+            ("World", 1.5, 1.0),
+        ]
+    
+    def test_build_result_as_arrays(self):
+        """Test the struct-of-arrays result used for bulk processing."""
+        np = pytest.importorskip("numpy")
+        captions = iter([
+            ("Hello", 0.0, 1.5),
+            ("  ", 1.5, 1.0),
+            ("World", 2.5, 1.0),
+        ])
+        
+        result = _build_result(captions, as_arrays=True)
+        
+        assert result["text"] == "Hello World"
+        assert "segments" not in result
+        assert list(result["texts"]) == ["Hello", "World"]
+        assert result["starts"].dtype == np.float32
+        np.testing.assert_allclose(result["starts"], [0.0, 2.5])
+        np.testing.assert_allclose(result["durations"], [1.5, 1.0])
+    
+    def test_build_result_consumes_iterator(self):
+        """Test that the result builder accepts a lazy caption iterator."""
+        captions = iter([
+            ("Hello", 0.0, 1.0),
+            ("World", 1.0, 1.0),
+        ])
+        
+        result = _build_result(captions)
+        
+        assert result["text"] == "Hello World"
+        assert len(result["segments"]) == 2
+
+
+class TestTimedtextCaptions:
+    """Tests for the player API caption track route."""
+    
+    def test_converts_json3_events(self):
+        """Test that segs are joined and text-less events are skipped."""
+        events = [
+            {"tStartMs": 0, "dDurationMs": 5000, "wWinId": 1},
+            {"tStartMs": 0, "dDurationMs": 1500, "segs": [{"utf8": "Hello"}, {"utf8": " there"}]},
+            {"tStartMs": 1500, "segs": [{"utf8": "World\nagain"}]},
+            {"tStartMs": 2400, "dDurationMs": 100, "aAppend": 1, "segs": [{"utf8": "\n"}]},
+        ]
+        
+        assert list(_iter_timedtext_captions(events)) == [
+            ("Hello there", 0.0, 1.5),
+            ("World again", 1.5, 1.0),
+        ]
+    
+    def test_json3_url_replaces_existing_format(self):
+        """Test that a format already present in the track URL is replaced."""
+        url = "https://www.youtube.com/api/timedtext?v=jNQXAC9IVRw&fmt=srv3&lang=en"
+        
+        assert _timedtext_json3_url(url) == (
+            "https://www.youtube.com/api/timedtext?v=jNQXAC9IVRw&lang=en&fmt=json3"
+        )
+    
+    @pytest.mark.parametrize("url", [
+        "https://www.youtube.com/api/timedtext?fmt=srv3&v=jNQXAC9IVRw&lang=en",
+        "https://www.youtube.com/api/timedtext?v=jNQXAC9IVRw&lang=en",
+    ])
+    def test_json3_url_format_first_or_missing(self, url):
+        """Test that a leading fmt parameter is replaced and a missing one added."""
+        assert _timedtext_json3_url(url) == (
+            "https://www.youtube.com/api/timedtext?v=jNQXAC9IVRw&lang=en&fmt=json3"
+        )
+    
+    def test_json3_url_keeps_signed_params(self):
+        """Test that signature params survive the rewrite unchanged."""
+        url = ("https://www.youtube.com/api/timedtext?v=jNQXAC9IVRw&sparams=ip,ipbits,expire"
+               "&signature=AB12.CD34&lang=en")
+        
+        assert _timedtext_json3_url(url) == url + "&fmt=json3"
+    
+    def test_select_track_by_language_priority(self):
+        """Test that the highest-priority language wins, else the first track."""
+        tracks = [
+            {"languageCode": "fr", "baseUrl": "fr"},
+            {"languageCode": "en", "baseUrl": "en"},
+            {"languageCode": "de", "baseUrl": "de"},
+        ]
+        
+        assert _select_caption_track(tracks, ["de", "en"])["baseUrl"] == "de"
+        assert _select_caption_track(tracks, ["es"])["baseUrl"] == "fr"
+
+
+class TestSessionRetries:
+    """Tests for the retry policy of the pooled session."""
+    
+    def test_retry_policy(self):
+        """Test that retries honor Retry-After and return the final response."""
+        session = _create_session_with_retries()
+        retry = session.get_adapter("https://www.youtube.com").max_retries
+        
+        assert retry.respect_retry_after_header
+        assert not retry.raise_on_status
+        assert 429 in retry.status_forcelist
+        assert "POST" in retry.allowed_methods
+
+
+class TestBuildLanguageList:
+    """Tests for the language priority list."""
+    
+    def test_preferred_language_first_without_duplicates(self):
+        """Test that the preferred language and its base lead the deduplicated chain."""
+        assert _build_language_list("en-US") == ["en-US", "en", "de", "de-DE", "en-GB"]
+        assert _build_language_list() == ["de", "de-DE", "en", "en-US", "en-GB"]
 
 
 class TestVideoIdExtraction:
     """Tests for video ID extraction from URLs."""
     
     @patch('yt_transcript_downloader.transcript_extractor._fetch_transcript')
-    @patch('yt_transcript_downloader.transcript_extractor._format_transcript_no_timestamps')
-    def test_extract_from_standard_url(self, mock_format, mock_fetch):
+    def test_extract_from_standard_url(self, mock_fetch):
         """Test extracting from standard watch URL."""
-        mock_fetch.return_value = [{"text": "test", "start": 0, "duration": 1}]
-        mock_format.return_value = {"text": "test", "segments": [], "language": None}
+        mock_fetch.return_value = {"text": "test", "segments": [], "language": None}
         
-        url = "https://www.youtube.com/watch?v=abc123"
+        url = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
         result = extract_transcript_direct(url)
         
         # Verify the function was called (indicating video ID was extracted)
         assert mock_fetch.called
     
     @patch('yt_transcript_downloader.transcript_extractor._fetch_transcript')
-    @patch('yt_transcript_downloader.transcript_extractor._format_transcript_no_timestamps')
-    def test_extract_from_short_url(self, mock_format, mock_fetch):
+    def test_extract_from_short_url(self, mock_fetch):
         """Test extracting from youtu.be short URL."""
-        mock_fetch.return_value = [{"text": "test", "start": 0, "duration": 1}]
-        mock_format.return_value = {"text": "test", "segments": [], "language": None}
+        mock_fetch.return_value = {"text": "test", "segments": [], "language": None}
         
-        url = "https://youtu.be/abc123"
+        url = "https://youtu.be/dQw4w9WgXcQ"
         result = extract_transcript_direct(url)
         
         assert mock_fetch.called
     
+    def test_extract_video_id_forms(self):
+        """Test that every supported URL form and a bare ID yield the ID."""
+        for url in [
+            "dQw4w9WgXcQ",
+            "https://www.youtube.com/watch?v=dQw4w9WgXcQ&t=123s",
+            "https://www.youtube.com/watch?feature=share&v=dQw4w9WgXcQ",
+            "https://youtu.be/dQw4w9WgXcQ",
+            "https://www.youtube.com/embed/dQw4w9WgXcQ",
+            "https://www.youtube.com/shorts/dQw4w9WgXcQ",
+            "https://www.youtube.com/live/dQw4w9WgXcQ?si=abc",
+            "https://www.youtube.com/v/dQw4w9WgXcQ",
+            "youtube.com/watch?v=dQw4w9WgXcQ",
+        ]:
+            assert extract_video_id(url) == "dQw4w9WgXcQ", url
+    
     def test_invalid_video_id(self):
         """Test with invalid video ID."""
         url = "https://example.com/not-a-youtube-url"
@@ -132,6 +340,304 @@ class TestVideoIdExtraction:
         """Test with empty URL."""
         result = extract_transcript_direct("")
         assert result is None
+    
+    @patch('requests.Session.request')
+    def test_invalid_url_makes_no_network_call(self, mock_request):
+        """Test that non-YouTube URLs and malformed IDs are rejected before any request."""
+        for url in [
+            "https://example.com/not-a-youtube-url",
+            "https://example.com/watch?v=dQw4w9WgXcQ",
+            "https://www.youtube.com/watch?v=invalid",
+            "https://www.youtube.com/channel/UC38IQsAvIsxxjztdMZQtwHA",
+            "https://www.youtube.com/shorts/dQw4w9WgXcQextra",
+            "https://www.youtube.com/playlist?list=/v/AAAAAAAAAAA",
+            "https://www.youtube.com/watch?feature=/embed/AAAAAAAAAAA",
+            "https://youtu.be/dQw4w9WgXcQextra",
+        ]:
+            assert extract_transcript_direct(url) is None
+        
+        assert not mock_request.called
+
+
+class TestTranscriptCache:
+    """Tests for the in-process transcript memoization."""
+    
+    def test_signature_shows_use_cache(self):
+        """Test that introspection sees the wrapper's own use_cache parameter."""
+        assert "use_cache" in inspect.signature(extract_transcript_direct).parameters
+        assert "use_cache" in extract_transcript_direct.__doc__
+    
+    @patch('yt_transcript_downloader.transcript_extractor._fetch_transcript')
+    def test_repeat_call_served_from_cache(self, mock_fetch):
+        """Test that the same video is only fetched once, whatever the URL form."""
+        mock_fetch.return_value = _build_result([("test", 0.0, 1.0)])
+        
+        first = extract_transcript_direct("https://www.youtube.com/watch?v=jNQXAC9IVRw")
+        second = extract_transcript_direct("https://youtu.be/jNQXAC9IVRw")
+        
+        assert first == second
+        assert mock_fetch.call_count == 1
+    
+    @patch('yt_transcript_downloader.transcript_extractor._fetch_transcript')
+    def test_caller_mutation_does_not_reach_cache(self, mock_fetch):
+        """Test that each call gets its own copy of a cached result."""
+        mock_fetch.return_value = _build_result([("test", 0.0, 1.0)])
+        url = "https://www.youtube.com/watch?v=jNQXAC9IVRw"
+        
+        first = extract_transcript_direct(url)
+        first["text"] = "MUTATED"
+        first["segments"][0]["text"] = "MUTATED"
+        second = extract_transcript_direct(url)
+        second["segments"].clear()
+        third = extract_transcript_direct(url)
+        
+        assert third["text"] == "test"
+        assert third["segments"] == [{"id": 0, "text": "test", "start": 0.0, "duration": 1.0}]
+        assert mock_fetch.call_count == 1
+    
+    @patch('yt_transcript_downloader.transcript_extractor._fetch_transcript')
+    def test_failures_not_cached(self, mock_fetch):
+        """Test that failed extractions are retried on the next call."""
+        mock_fetch.return_value = None
+        url = "https://www.youtube.com/watch?v=jNQXAC9IVRw"
+        
+        assert extract_transcript_direct(url) is None
+        assert extract_transcript_direct(url) is None
+        assert mock_fetch.call_count == 2
+    
+    @patch('yt_transcript_downloader.transcript_extractor._fetch_transcript')
+    def test_cache_clear(self, mock_fetch):
+        """Test that cache_clear forces a fresh fetch."""
+        mock_fetch.return_value = _build_result([("test", 0.0, 1.0)])
+        url = "https://www.youtube.com/watch?v=jNQXAC9IVRw"
+        
+        extract_transcript_direct(url)
+        extract_transcript_direct.cache_clear()
+        extract_transcript_direct(url)
+        
+        assert mock_fetch.call_count == 2
+
+
+class TestDiskCache:
+    """Tests for the optional on-disk transcript cache."""
+    
+    @pytest.fixture
+    def disk_cache(self, tmp_path, monkeypatch):
+        diskcache = pytest.importorskip("diskcache")
+        cache = diskcache.Cache(str(tmp_path))
+        monkeypatch.setattr("yt_transcript_downloader._disk_cache", cache)
+        yield cache
+        cache.close()
+    
+    @patch('yt_transcript_downloader.transcript_extractor._fetch_transcript')
+    def test_disk_hit_skips_fetch(self, mock_fetch, disk_cache):
+        """Test that a transcript survives dropping the in-memory cache."""
+        import yt_transcript_downloader
+        mock_fetch.return_value = _build_result([("test", 0.0, 1.0)])
+        url = "https://www.youtube.com/watch?v=jNQXAC9IVRw"
+        
+        first = extract_transcript_direct(url)
+        yt_transcript_downloader._cache.clear()
+        second = extract_transcript_direct(url)
+        
+        assert first == second
+        assert mock_fetch.call_count == 1
+        
+        extract_transcript_direct.cache_clear()
+        assert len(disk_cache) == 0
+    
+    @patch('yt_transcript_downloader.transcript_extractor._fetch_transcript')
+    def test_use_cache_false_bypasses_caches(self, mock_fetch, disk_cache):
+        """Test that use_cache=False always fetches and stores nothing."""
+        mock_fetch.return_value = _build_result([("test", 0.0, 1.0)])
+        url = "https://www.youtube.com/watch?v=jNQXAC9IVRw"
+        
+        extract_transcript_direct(url, use_cache=False)
+        extract_transcript_direct(url, use_cache=False)
+        
+        assert mock_fetch.call_count == 2
+        assert len(disk_cache) == 0
+
+
+class TestSessionInjection:
+    """Tests for running the full pipeline on a caller-supplied session."""
+    
+    @pytest.fixture(autouse=True)
+    def fresh_module_state(self, monkeypatch):
+        """Start with no remembered API key."""
+        monkeypatch.setattr(
+            "yt_transcript_downloader.transcript_extractor._API_KEY_CACHE", (None, 0.0)
+        )
+    
+    WATCH_HTML = (
+        b'<script>{"INNERTUBE_API_KEY":"AIzaSyTest1234567890"}</script>'
+        b'<script>{"getTranscriptEndpoint":{"params":"CgtwYXJhbXM="}}</script>'
+    )
+    API_RESPONSE = {"actions": [{"updateEngagementPanelAction": {"content": {
+        "transcriptRenderer": {"content": {"transcriptSearchPanelRenderer": {"body": {
+            "transcriptSegmentListRenderer": {"initialSegments": [
+                {"transcriptSegmentRenderer": {
+                    "startMs": "0", "endMs": "1000",
+                    "snippet": {"runs": [{"text": "Hello"}]},
+                }},
+                {"transcriptSegmentRenderer": {
+                    "startMs": "1000", "endMs": "2000",
+                    "snippet": {"runs": [{"text": "World"}]},
+                }},
+            ]}
+        }}}}
+    }}}]}
+    
+    def _make_session(self):
+        # Split mid-key so the match has to span a chunk boundary
+        page = MagicMock(status_code=200)
+        page.__enter__.return_value = page
+        page.iter_content.return_value = iter([self.WATCH_HTML[:30], self.WATCH_HTML[30:]])
+        api = MagicMock(status_code=200)
+        api.content = json.dumps(self.API_RESPONSE).encode()
+        session = MagicMock()
+        session.get.return_value = page
+        session.post.return_value = api
+        return session
+    
+    PLAYER_RESPONSE = {"captions": {"playerCaptionsTracklistRenderer": {"captionTracks": [
+        {"languageCode": "en", "baseUrl": "https://www.youtube.com/api/timedtext?v=jNQXAC9IVRw&lang=en"},
+    ]}}}
+    TIMEDTEXT_RESPONSE = {"events": [
+        {"tStartMs": 0, "dDurationMs": 1000, "segs": [{"utf8": "Hello"}]},
+        {"tStartMs": 1000, "dDurationMs": 1000, "segs": [{"utf8": "World"}]},
+    ]}
+    
+    @patch('yt_transcript_downloader.transcript_extractor._get_session')
+    def test_player_route(self, mock_get_session):
+        """Test that caption tracks from the player API skip the watch page."""
+        player = MagicMock(status_code=200)
+        player.content = json.dumps(self.PLAYER_RESPONSE).encode()
+        timedtext = MagicMock(status_code=200)
+        timedtext.content = json.dumps(self.TIMEDTEXT_RESPONSE).encode()
+        session = MagicMock()
+        session.post.return_value = player
+        session.get.return_value = timedtext
+        
+        result = extract_transcript_direct(
+            "https://www.youtube.com/watch?v=jNQXAC9IVRw", session=session
+        )
+        
+        assert result["text"] == "Hello World"
+        assert session.get.call_count == 1
+        assert session.get.call_args[0][0].endswith("&lang=en&fmt=json3")
+        assert not mock_get_session.called
+    
+    @patch('yt_transcript_downloader.transcript_extractor._get_session')
+    def test_uses_given_session(self, mock_get_session):
+        """Test that an injected session is used, falling back to the watch page route."""
+        session = self._make_session()
+        
+        result = extract_transcript_direct(
+            "https://www.youtube.com/watch?v=jNQXAC9IVRw", session=session
+        )
+        
+        assert result["text"] == "Hello World"
+        assert session.get.call_args[1]["stream"] is True
+        assert session.get.call_args[1]["timeout"] == (3.05, 10)
+        assert session.post.called
+        assert "key=AIzaSyTest1234567890" in session.post.call_args[0][0]
+        assert json.loads(session.post.call_args[1]["data"]) == {
+            "context": {"client": {"clientName": "WEB", "clientVersion": "2.20230101.00.00"}},
+            "params": "CgtwYXJhbXM=",
+        }
+        assert not mock_get_session.called
+    
+    @patch('yt_transcript_downloader.transcript_extractor._get_session')
+    def test_injected_session_gets_browser_headers(self, mock_get_session):
+        """Test that every request on an injected session carries the browser headers."""
+        session = self._make_session()
+        
+        extract_transcript_direct("https://www.youtube.com/watch?v=jNQXAC9IVRw", session=session)
+        
+        calls = session.get.call_args_list + session.post.call_args_list
+        assert len(calls) >= 3  # player API, watch page, get_transcript
+        for call in calls:
+            headers = call[1]["headers"]
+            assert headers["User-Agent"].startswith("Mozilla/5.0")
+            assert headers["Origin"] == "https://www.youtube.com"
+        assert session.post.call_args[1]["headers"]["Content-Type"] == "application/json"
+    
+    @patch('yt_transcript_downloader.transcript_extractor._fetch_via_player', return_value=None)
+    def test_api_key_remembered_between_calls(self, mock_player):
+        """Test that a second video reuses the API key found on the first page."""
+        session = self._make_session()
+        extract_transcript_direct("https://www.youtube.com/watch?v=jNQXAC9IVRw", session=session)
+        
+        # Second page carries only the params
+        page = session.get.return_value
+        page.iter_content.return_value = iter([self.WATCH_HTML.split(b"</script>")[1]])
+        result = extract_transcript_direct("https://www.youtube.com/watch?v=dQw4w9WgXcQ", session=session)
+        
+        assert result["text"] == "Hello World"
+        assert "key=AIzaSyTest1234567890" in session.post.call_args[0][0]
+    
+    @patch('yt_transcript_downloader.transcript_extractor._fetch_via_player')
+    @patch('yt_transcript_downloader.transcript_extractor._get_session')
+    def test_slow_player_hedged_on_shared_session(self, mock_get_session, mock_player, monkeypatch):
+        """Test that the watch page is fetched while a slow player call is still running."""
+        monkeypatch.setattr("yt_transcript_downloader.transcript_extractor._HEDGE_DELAY", 0.0)
+        session = self._make_session()
+        mock_get_session.return_value = session
+        
+        def slow_player_fails(video_id, languages, player_session, timeout):
+            assert _wait_for(lambda: session.get.called)
+            return None
+        mock_player.side_effect = slow_player_fails
+        
+        result = extract_transcript_direct("https://www.youtube.com/watch?v=jNQXAC9IVRw")
+        
+        assert result["text"] == "Hello World"
+        assert session.get.call_count == 1
+    
+    @patch('yt_transcript_downloader.transcript_extractor._fetch_via_player')
+    @patch('yt_transcript_downloader.transcript_extractor._get_session')
+    def test_fast_player_skips_hedge(self, mock_get_session, mock_player):
+        """Test that a player call answering within the delay never loads the watch page."""
+        session = self._make_session()
+        mock_get_session.return_value = session
+        mock_player.return_value = self.TIMEDTEXT_RESPONSE["events"]
+        
+        result = extract_transcript_direct("https://www.youtube.com/watch?v=jNQXAC9IVRw")
+        
+        assert result["text"] == "Hello World"
+        assert not session.get.called
+    
+    @patch('yt_transcript_downloader.transcript_extractor._fetch_via_player_hedged')
+    @patch('yt_transcript_downloader.transcript_extractor._fetch_via_player', return_value=None)
+    def test_injected_session_never_hedged(self, mock_player, mock_hedged):
+        """Test that a caller's session is only used from the calling thread."""
+        session = self._make_session()
+        caller = threading.get_ident()
+        threads = []
+        session.get.side_effect = lambda *args, **kwargs: (
+            threads.append(threading.get_ident()) or session.get.return_value
+        )
+        
+        result = extract_transcript_direct(
+            "https://www.youtube.com/watch?v=jNQXAC9IVRw", session=session
+        )
+        
+        assert result["text"] == "Hello World"
+        assert not mock_hedged.called
+        assert threads == [caller]
+    
+    def test_cancelled_scan_stops_reading(self):
+        """Test that a cancelled watch page scan stops at the next chunk."""
+        session = self._make_session()
+        read = []
+        chunks = [b"<html>", b"<body>", self.WATCH_HTML]
+        session.get.return_value.iter_content.return_value = (read.append(c) or c for c in chunks)
+        cancelled = threading.Event()
+        cancelled.set()
+        
+        assert _extract_params_from_html("jNQXAC9IVRw", session, cancelled=cancelled) is None
+        assert read == [b"<html>"]
 
 
 class TestIntegration:
@@ -0,0 +1,167 @@
+"""
+Unit tests for yt_transcript_downloader.transcript_extractor_async.
+
+Run with: python -m pytest test_transcript_extractor_async.py
+"""
+
+import asyncio
+import threading
+
+import pytest
+from unittest.mock import patch, AsyncMock
+
+pytest.importorskip("aiohttp")
+
+from yt_transcript_downloader.transcript_extractor import _build_result
+from yt_transcript_downloader.transcript_extractor_async import (
+    _call_api,
+    _fetch_html,
+    _fetch_via_player,
+    extract_transcripts_direct,
+)
+
+
+def _segment(text, start_ms):
+    """Build a get_transcript API segment."""
+    return {"transcriptSegmentRenderer": {
+        "startMs": str(start_ms),
+        "endMs": str(start_ms + 1000),
+        "snippet": {"runs": [{"text": text}]},
+    }}
+
+
+class _FakeResponse:
+    """Minimal stand-in for an aiohttp response used as a context manager."""
+    
+    def __init__(self, body, status=200):
+        self.status = status
+        self._body = body
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc):
+        return False
+    
+    def raise_for_status(self):
+        pass
+    
+    async def read(self):
+        return self._body
+
+
+class _FakeSession:
+    """Session whose every request answers with the same body."""
+    
+    def __init__(self, body):
+        self.body = body
+    
+    def get(self, url, **kwargs):
+        return _FakeResponse(self.body)
+    
+    post = get
+
+
+class TestFetchHelpers:
+    """Tests for the async fetch helpers' error handling."""
+    
+    @pytest.mark.parametrize("body", [b"<html>not json</html>", b"[]"])
+    def test_unexpected_response_returns_none(self, body):
+        """Test that malformed responses return None so the fallback can run."""
+        session = _FakeSession(body)
+        
+        assert asyncio.run(_fetch_via_player(session, "AAAAAAAAAAA", ["en"])) is None
+        assert asyncio.run(_call_api(session, "params", "key", "AAAAAAAAAAA")) is None
+    
+    def test_fetch_html_unexpected_error_returns_none(self):
+        """Test that a non-network error while reading the page returns None."""
+        session = _FakeSession(b"")  # _FakeResponse has no .content to stream
+        
+        assert asyncio.run(_fetch_html(session, "AAAAAAAAAAA")) is None
+
+
+class TestBatchExtraction:
+    """Tests for concurrent batch extraction."""
+    
+    @patch('yt_transcript_downloader.transcript_extractor_async._call_api', new_callable=AsyncMock)
+    @patch('yt_transcript_downloader.transcript_extractor_async._fetch_html', new_callable=AsyncMock)
+    @patch('yt_transcript_downloader.transcript_extractor_async._fetch_via_player', new_callable=AsyncMock)
+    def test_results_aligned_with_urls(self, mock_player, mock_html, mock_api):
+        """Test that results keep request order and failures are None."""
+        mock_player.return_value = None
+        mock_html.side_effect = lambda session, video_id: (
+            None if video_id == "BBBBBBBBBBB" else {"params": video_id, "api_key": "key"}
+        )
+        mock_api.side_effect = lambda session, params, api_key, video_id: [_segment(params, 0)]
+        
+        results = extract_transcripts_direct([
+            "https://www.youtube.com/watch?v=AAAAAAAAAAA",
+            "https://youtu.be/BBBBBBBBBBB",
+            "https://example.com/not-a-youtube-url",
+            "https://youtu.be/CCCCCCCCCCC",
+        ])
+        
+        assert len(results) == 4
+        assert results[0]["text"] == "AAAAAAAAAAA"
+        assert results[1] is None
+        assert results[2] is None
+        assert results[3]["text"] == "CCCCCCCCCCC"
+        assert mock_html.call_count == 3  # Invalid URL never reaches the network
+    
+    @patch('yt_transcript_downloader.transcript_extractor_async._fetch_html', new_callable=AsyncMock)
+    @patch('yt_transcript_downloader.transcript_extractor_async._fetch_via_player', new_callable=AsyncMock)
+    def test_player_route_skips_watch_page(self, mock_player, mock_html):
+        """Test that a caption track from the player API avoids the HTML fallback."""
+        mock_player.return_value = [{"tStartMs": 0, "dDurationMs": 1000, "segs": [{"utf8": "Hello"}]}]
+        
+        results = extract_transcripts_direct(["https://youtu.be/AAAAAAAAAAA"])
+        
+        assert results[0]["text"] == "Hello"
+        assert not mock_html.called
+    
+    @patch('yt_transcript_downloader.transcript_extractor_async._build_result')
+    @patch('yt_transcript_downloader.transcript_extractor_async._fetch_via_player', new_callable=AsyncMock)
+    def test_result_built_off_event_loop(self, mock_player, mock_build):
+        """Test that the CPU-bound result building runs outside the event loop thread."""
+        loop_thread = []
+        build_thread = []
+        
+        async def player(session, video_id, languages):
+            loop_thread.append(threading.get_ident())
+            return [{"tStartMs": 0, "dDurationMs": 1000, "segs": [{"utf8": "Hello"}]}]
+        mock_player.side_effect = player
+        
+        def build(captions):
+            build_thread.append(threading.get_ident())
+            return _build_result(captions)
+        mock_build.side_effect = build
+        
+        results = extract_transcripts_direct(["https://youtu.be/AAAAAAAAAAA"])
+        
+        assert results[0]["text"] == "Hello"
+        assert build_thread and build_thread != loop_thread
+    
+    @patch('yt_transcript_downloader.transcript_extractor_async._fetch_via_player', new_callable=AsyncMock)
+    def test_in_flight_videos_bounded_by_concurrency(self, mock_player):
+        """Test that a batch larger than the concurrency never runs more videos at once."""
+        in_flight = 0
+        peak = 0
+        
+        async def player(session, video_id, languages):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return [{"tStartMs": 0, "dDurationMs": 1000, "segs": [{"utf8": video_id}]}]
+        mock_player.side_effect = player
+        
+        urls = [f"https://youtu.be/{i:011d}" for i in range(8)]
+        results = extract_transcripts_direct(urls, concurrency=2)
+        
+        assert [r["text"] for r in results] == [f"{i:011d}" for i in range(8)]
+        assert peak == 2
+    
+    def test_empty_batch(self):
+        """Test that an empty batch returns an empty list."""
+        assert extract_transcripts_direct([]) == []
@@ -0,0 +1,288 @@
+"""YouTube Transcript Downloader - Async batch extraction.
+
+Fetches many transcripts concurrently over a single aiohttp session, so a
+batch of N videos takes roughly as long as the slowest one instead of the
+sum of all of them. JSON parsing and result building run in the default
+executor so a long transcript does not stall the other downloads.
+
+Requires the optional ``aiohttp`` dependency:
+    pip install aiohttp
+
+Example:
+    from yt_transcript_downloader.transcript_extractor_async import extract_transcripts_direct
+
+    results = extract_transcripts_direct(urls, language="en")
+"""
+
+import asyncio
+import logging
+from typing import Optional, Dict, List, Any
+
+import aiohttp
+
+from .transcript_extractor import (
+    CONNECT_TIMEOUT,
+    READ_TIMEOUT,
+    YOUTUBE_API_URL,
+    YOUTUBE_PLAYER_API_KEY,
+    YOUTUBE_PLAYER_URL,
+    YOUTUBE_WATCH_URL,
+    _DEFAULT_HEADERS,
+    _JSON_HEADERS,
+    _build_api_payload,
+    _build_result,
+    _get_cached_api_key,
+    _build_language_list,
+    _build_player_payload,
+    _extract_caption_tracks,
+    _extract_segments,
+    _iter_captions,
+    _iter_timedtext_captions,
+    _loads,
+    _WATCH_PAGE_CHUNK_SIZE,
+    _WatchPageScanner,
+    _select_caption_track,
+    _set_cached_api_key,
+    _timedtext_json3_url,
+    extract_video_id,
+)
+
+__all__ = ["extract_transcripts_direct_async", "extract_transcripts_direct"]
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of videos fetched at the same time
+DEFAULT_CONCURRENCY = 20
+
+
+async def _run_cpu(func, *args):
+    """Run a CPU-bound function in the default executor, off the event loop."""
+    return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+
+async def _fetch_via_player(session: aiohttp.ClientSession, video_id: str, languages: List[str]) -> Optional[List[Dict]]:
+    """
+    Fetch timedtext events through the player API's caption tracks.
+    
+    Async counterpart of transcript_extractor._fetch_via_player.
+    
+    Args:
+        session: Shared aiohttp session
+        video_id: YouTube video ID
+        languages: Language codes in priority order
+    
+    Returns:
+        List of timedtext events, or None on failure
+    """
+    try:
+        url = f"{YOUTUBE_PLAYER_URL}?key={YOUTUBE_PLAYER_API_KEY}"
+        
+        async with session.post(url, data=_build_player_payload(video_id), headers=_JSON_HEADERS) as response:
+            if response.status == 429:
+                logger.warning("[%s] Rate limited by YouTube (429) on player API", video_id)
+                return None
+            
+            response.raise_for_status()
+            body = await response.read()
+        
+        tracks = _extract_caption_tracks(await _run_cpu(_loads, body))
+        if not tracks:
+            return None
+        
+        track = _select_caption_track(tracks, languages)
+        if not track.get('baseUrl'):
+            return None
+        
+        async with session.get(_timedtext_json3_url(track['baseUrl'])) as response:
+            response.raise_for_status()
+            body = await response.read()
+        
+        data = await _run_cpu(_loads, body)
+        return data.get('events') or None
+    
+    except asyncio.TimeoutError:
+        logger.warning("[%s] Timeout fetching caption track", video_id)
+        return None
+    except aiohttp.ClientError as e:
+        logger.warning("[%s] Error fetching caption track: %s", video_id, e)
+        return None
+    except Exception as e:
+        logger.warning("[%s] Unexpected error fetching caption track: %s", video_id, e)
+        return None
+
+
+async def _fetch_html(session: aiohttp.ClientSession, video_id: str) -> Optional[Dict[str, str]]:
+    """
+    Fetch the watch page and extract transcript params and API key.
+    
+    Async counterpart of transcript_extractor._extract_params_from_html.
+    
+    Args:
+        session: Shared aiohttp session
+        video_id: YouTube video ID
+    
+    Returns:
+        Dict with 'params' and 'api_key' strings, or None on failure
+    """
+    try:
+        url = f"{YOUTUBE_WATCH_URL}?v={video_id}"
+        
+        # Stop reading as soon as both values are found
+        cached_key = _get_cached_api_key()
+        scanner = _WatchPageScanner(api_key=cached_key)
+        async with session.get(url) as response:
+            response.raise_for_status()
+            async for chunk in response.content.iter_chunked(_WATCH_PAGE_CHUNK_SIZE):
+                if scanner.feed(chunk):
+                    break
+        
+        result = scanner.result(video_id)
+        if result and result["api_key"] != cached_key:
+            _set_cached_api_key(result["api_key"])
+        return result
+    
+    except asyncio.TimeoutError:
+        logger.warning("[%s] Timeout fetching page HTML", video_id)
+        return None
+    except aiohttp.ClientError as e:
+        logger.warning("[%s] Error fetching page HTML: %s", video_id, e)
+        return None
+    except Exception as e:
+        logger.warning("[%s] Unexpected error fetching page HTML: %s", video_id, e)
+        return None
+
+
+async def _call_api(session: aiohttp.ClientSession, params: str, api_key: str, video_id: str = "") -> Optional[List[Dict]]:
+    """
+    Call YouTube's internal get_transcript API.
+    
+    Async counterpart of transcript_extractor._call_transcript_api.
+    
+    Args:
+        session: Shared aiohttp session
+        params: Base64-encoded params from HTML
+        api_key: YouTube API key extracted from HTML
+        video_id: Video ID for logging purposes
+    
+    Returns:
+        List of transcript segments, or None on failure
+    """
+    try:
+        url = f"{YOUTUBE_API_URL}?key={api_key}"
+        
+        async with session.post(url, data=_build_api_payload(params), headers=_JSON_HEADERS) as response:
+            if response.status == 429:
+                logger.warning("[%s] Rate limited by YouTube (429)", video_id)
+                return None
+            
+            response.raise_for_status()
+            body = await response.read()
+        
+        return _extract_segments(await _run_cpu(_loads, body))
+    
+    except asyncio.TimeoutError:
+        logger.warning("[%s] Timeout calling YouTube API", video_id)
+        return None
+    except aiohttp.ClientError as e:
+        logger.warning("[%s] Error calling YouTube API: %s", video_id, e)
+        return None
+    except Exception as e:
+        logger.warning("[%s] Unexpected error calling YouTube API: %s", video_id, e)
+        return None
+
+
+async def _extract_one(session: aiohttp.ClientSession, url: str, language: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Extract a single transcript using the shared session.
+    
+    Returns:
+        Same dict as extract_transcript_direct, or None if extraction failed
+    """
+    try:
+        video_id = extract_video_id(url)
+        if not video_id:
+            logger.warning("Failed to extract video ID from %s", url)
+            return None
+        
+        languages_to_try = _build_language_list(language)
+        logger.debug("[%s] Fetching transcript (languages: %s)", video_id, languages_to_try)
+        
+        events = await _fetch_via_player(session, video_id, languages_to_try)
+        if events:
+            captions = _iter_timedtext_captions(events)
+        else:
+            # Fall back to the watch page + get_transcript route
+            extraction_result = await _fetch_html(session, video_id)
+            if not extraction_result:
+                logger.warning("[%s] Failed to extract transcript", video_id)
+                return None
+            
+            segments = await _call_api(session, extraction_result["params"], extraction_result["api_key"], video_id)
+            if not segments:
+                logger.warning("[%s] Failed to extract transcript", video_id)
+                _set_cached_api_key(None)
+                return None
+            
+            captions = _iter_captions(segments)
+        
+        result = await _run_cpu(_build_result, captions)
+        if not result['segments']:
+            logger.warning("[%s] No valid captions extracted from API response", video_id)
+            return None
+        
+        logger.info("[%s] ✓ Extracted transcript: %d segments", video_id, len(result['segments']))
+        return result
+    
+    except Exception as e:
+        logger.warning("Direct extraction failed for %s: %s", url, e, exc_info=True)
+        return None
+
+
+async def extract_transcripts_direct_async(
+    urls: List[str],
+    language: Optional[str] = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> List[Optional[Dict[str, Any]]]:
+    """
+    Extract transcripts for many YouTube URLs concurrently.
+    
+    All requests share one aiohttp session, so connections to YouTube are
+    reused across videos.
+    
+    Args:
+        urls: YouTube URLs (any format accepted by extract_transcript_direct)
+        language: Preferred language code applied to every URL
+        concurrency: Maximum number of videos fetched (and connections
+                     open) at the same time
+    
+    Returns:
+        List aligned with ``urls``; each item is the extract_transcript_direct
+        result dict or None if that video failed
+    """
+    connector = aiohttp.TCPConnector(limit=concurrency, ttl_dns_cache=300)
+    timeout = aiohttp.ClientTimeout(total=READ_TIMEOUT, sock_connect=CONNECT_TIMEOUT)
+    
+    # The total timeout includes waiting for a free connection, so videos
+    # beyond the connector limit must not start until a slot frees up
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def extract_bounded(session, url):
+        async with semaphore:
+            return await _extract_one(session, url, language)
+    
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout, headers=_DEFAULT_HEADERS) as session:
+        return await asyncio.gather(*(extract_bounded(session, url) for url in urls))
+
+
+def extract_transcripts_direct(
+    urls: List[str],
+    language: Optional[str] = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> List[Optional[Dict[str, Any]]]:
+    """
+    Synchronous wrapper around extract_transcripts_direct_async.
+    
+    Must not be called from a running event loop; await
+    extract_transcripts_direct_async there instead.
+    """
+    return asyncio.run(extract_transcripts_direct_async(urls, language=language, concurrency=concurrency))